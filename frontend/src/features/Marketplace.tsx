@@ -322,7 +322,10 @@ export const Marketplace = () => {
                   {article.image_principale && (
                     <div className="h-48">
                       <img 
-                        src={article.image_principale} 
+                        src={article.image_principale_thumbnail
+                          ? `${import.meta.env.VITE_API_BASE_URL}/thumbnails/${article.image_principale_thumbnail}`
+                          : article.image_principale}
+                        loading="lazy" 
                         alt={article.titre} 
                         className="w-full h-full object-cover"
                         onError={(e) => {
@@ -9,24 +9,26 @@ import logging
 import time
 import random
 import os
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional
 import requests
+from urllib.parse import urljoin
 from bs4 import BeautifulSoup
 import concurrent.futures
-from threading import Lock
 
 from models import Article
 from db_manager import DatabaseManager
+from images import ImagePipeline, resoudre_source_image
+from dedup import canonicaliser_url, calculer_simhash, bandes_simhash, SIMHASH_MAX_DISTANCE
 
 logger = logging.getLogger(__name__)
 
 class ArticleScraper:
-    def __init__(self, collection_name: str = "articles", timeout: int = 30, max_workers: int = 5):
+    def __init__(self, collection_name: str = "articles", timeout: int = 30, max_workers: int = 5,
+                 traiter_images: bool = False, image_workers: int = 4):
         # Chargement des variables d'environnement
         
         self.timeout = timeout
         self.max_workers = max_workers
-        self.results_lock = Lock()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept-Language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
@@ -47,23 +49,55 @@ class ArticleScraper:
         self.db_manager.init_db()
         logger.info(f"Connexion à MongoDB établie (collection: {collection_name})")
 
+        # Étape optionnelle de déduplication des images et de génération des miniatures
+        self.pipeline_images = None
+        if traiter_images:
+            self.pipeline_images = ImagePipeline(
+                db_manager=self.db_manager,
+                session=self.session,
+                dossier=os.getenv('THUMBNAILS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'thumbnails')),
+                max_workers=image_workers,
+                timeout=timeout
+            )
+            logger.info(f"Traitement des images activé ({image_workers} téléchargements simultanés)")
+
+        # Pool de workers partagé par toutes les pages (voir traiter_articles)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+
     def pause_aleatoire(self, min_secs: float = 1.0, max_secs: float = 3.0) -> None:
         delay = random.uniform(min_secs, max_secs)
         logger.debug(f"Pause de {delay:.2f} secondes")
         time.sleep(delay)
 
-    def extraire_article(self, url_article: str, categorie_forcee: str = None) -> Optional[Dict[str, Any]]:
-        if self.db_manager.article_exists(url_article):
+    def extraire_article(self, url_article: str, categorie_forcee: str = None, forcer: bool = False) -> Optional[Dict[str, Any]]:
+        # Le lien trouvé est récupéré tel quel ; sa forme canonique sert uniquement de clé
+        url_recuperee = url_article
+        url_article = canonicaliser_url(url_recuperee)
+        if not forcer and self.db_manager.article_exists(url_article):
             logger.info(f"Article déjà existant: {url_article}")
             return None
 
+        soup = None
         try:
-            logger.info(f"Extraction de l'article: {url_article}")
-            response = self.session.get(url_article, timeout=self.timeout)
+            logger.info(f"Extraction de l'article: {url_recuperee}")
+            response = self.session.get(url_recuperee, timeout=self.timeout)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.text, 'lxml')
 
+            # Respect de l'URL canonique déclarée par la page
+            # (le href peut être relatif : il est résolu par rapport à l'URL récupérée)
+            url_alias = url_article
+            canonical = soup.select_one('link[rel="canonical"]')
+            if canonical and canonical.get('href'):
+                url_canonique = canonicaliser_url(urljoin(url_recuperee, canonical['href']))
+                if url_canonique != url_article:
+                    if not forcer and self.db_manager.article_exists(url_canonique):
+                        logger.info(f"Article déjà existant sous son URL canonique: {url_canonique}")
+                        self.db_manager.lier_doublon(url_canonique, url_article)
+                        return None
+                    url_article = url_canonique
+
             titre = soup.select_one('h1.entry-title')
             titre = titre.text.strip() if titre else "Sans titre"
 
@@ -105,7 +139,9 @@ class ArticleScraper:
 
             # Récupération de l'image principale avec la classe wp-post-image
             image_principale = soup.select_one('img.wp-post-image')
-            image_principale = image_principale['src'] if image_principale and 'src' in image_principale.attrs else None
+            image_principale = resoudre_source_image(image_principale) if image_principale else None
+            # Les sources relatives (/wp-content/..., //cdn...) sont résolues par rapport à la page récupérée
+            image_principale = urljoin(url_recuperee, image_principale) if image_principale else None
 
             date_element = soup.select_one('.posted-on time.entry-date')
             date_publication = date_element['datetime'] if date_element and 'datetime' in date_element.attrs else date_element.text.strip() if date_element else None
@@ -118,22 +154,31 @@ class ArticleScraper:
 
             tags = [tag.text.strip() for tag in soup.select('.tags-list a')]
 
+            # Résolution des sources lazy-load (data-src, srcset) et dédoublonnage des URLs
             images_dict = []
-            has_real_image = False
+            urls_images = set()
             for img in soup.select('article img'):
-                src = img.get('src')
-                alt = img.get('alt', '')
-                if src:
-                    if not src.startswith('data:image/svg+xml'):
-                        images_dict.append({'url': src, 'alt': alt})
-                        has_real_image = True
-                    elif not has_real_image:  # Si c'est un SVG et qu'on n'a pas encore d'image réelle
-                        images_dict.append({'url': src, 'alt': alt})
+                src = resoudre_source_image(img)
+                src = urljoin(url_recuperee, src) if src else None
+                if src and src not in urls_images:
+                    urls_images.add(src)
+                    images_dict.append({'url': src, 'alt': img.get('alt', '')})
 
             # Si aucune image n'a été trouvée, utiliser l'image principale comme fallback
             if not images_dict and image_principale:
                 images_dict.append({'url': image_principale, 'alt': 'Image principale'})
 
+            # Empreinte SimHash du titre et du corps pour détecter les republications
+            corps = soup.select_one('.entry-content')
+            simhash = calculer_simhash(f"{titre} {corps.get_text(' ') if corps else resume}")
+            simhash_bands = bandes_simhash(simhash) if simhash is not None else []
+            if simhash is not None and not forcer:
+                url_originale = self.db_manager.trouver_quasi_doublon(simhash, simhash_bands, SIMHASH_MAX_DISTANCE)
+                if url_originale and url_originale != url_article:
+                    logger.info(f"Quasi-doublon détecté: {url_article} -> {url_originale}")
+                    self.db_manager.lier_doublon(url_originale, url_article)
+                    return None
+
             article = Article(
                 titre=titre,
                 url=url_article,
@@ -144,15 +189,33 @@ class ArticleScraper:
                 categorie=categorie,
                 tags=tags,
                 sous_categorie=sous_categorie,
-                images=images_dict
+                images=images_dict,
+                simhash=f"{simhash:016x}" if simhash is not None else None,
+                simhash_bands=simhash_bands
             )
-            return article.to_dict()
+            # L'arbre HTML n'est plus nécessaire : libération avant l'étape images
+            soup.decompose()
+            soup = None
+
+            article_data = article.to_dict()
+            # L'URL récupérée est conservée comme alias pour ne pas être refetchée au prochain passage
+            if url_alias != url_article:
+                article_data['doublons'] = [url_alias]
+            if self.pipeline_images:
+                self.pipeline_images.traiter_images(article_data)
+            return article_data
 
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction de l'article {url_article}: {str(e)}")
             return None
 
+        finally:
+            # Libération immédiate de l'arbre HTML (références circulaires parent/enfants)
+            if soup is not None:
+                soup.decompose()
+
     def extraire_liens_page(self, url_page: str) -> List[str]:
+        soup = None
         try:
             logger.info(f"Scraping de la page: {url_page}")
             response = self.session.get(url_page, timeout=self.timeout)
@@ -174,7 +237,12 @@ class ArticleScraper:
             logger.error(f"Erreur lors du scraping de la page {url_page}: {str(e)}")
             return []
 
+        finally:
+            if soup is not None:
+                soup.decompose()
+
     def trouver_page_suivante(self, url_actuelle: str) -> Optional[str]:
+        soup = None
         try:
             logger.info(f"Recherche de la page suivante à partir de: {url_actuelle}")
             response = self.session.get(url_actuelle, timeout=self.timeout)
@@ -191,12 +259,18 @@ class ArticleScraper:
                 'a[rel="next"]'  # Sélecteur par attribut rel
             ]
             
+            next_url = None
             for selector in next_link_selectors:
                 next_link = soup.select_one(selector)
                 if next_link and 'href' in next_link.attrs:
                     next_url = next_link['href']
                     logger.info(f"Page suivante trouvée avec le sélecteur {selector}: {next_url}")
-                    return next_url
+                    break
+            # L'arbre HTML n'est plus nécessaire pour construire l'URL de secours
+            soup.decompose()
+            soup = None
+            if next_url:
+                return next_url
             
             # Si aucun sélecteur ne fonctionne, essayer d'extraire le numéro de page de l'URL
             import re
@@ -225,7 +299,17 @@ class ArticleScraper:
             logger.error(f"Erreur lors de la recherche de la page suivante: {str(e)}")
             return None
 
-    def executer(self, url_depart: str, max_pages: int = 3, categorie_forcee: str = None) -> Dict[str, int]:
+        finally:
+            if soup is not None:
+                soup.decompose()
+
+    def executer(self, url_depart: str, max_pages: int = 3, categorie_forcee: str = None, fermer_connexion: bool = True,
+                 sur_resultat: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, int]:
+        """
+        Parcourt les pages de listing à partir de url_depart et traite leurs articles.
+        Si fermer_connexion est faux, le scraper reste utilisable (mode démon) ;
+        sur_resultat est appelé pour chaque article inséré ou mis à jour.
+        """
         total_articles = 0
         total_inseres = 0
         total_mis_a_jour = 0
@@ -244,23 +328,13 @@ class ArticleScraper:
             
             logger.info(f"Page {page_count}: Traitement de {len(urls_articles)} articles en parallèle avec {self.max_workers} workers")
             
-            # Traitement en parallèle des articles
-            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                # Créer les futures pour chaque URL d'article
-                futures = {executor.submit(self.traiter_article, url_article, categorie_forcee): url_article for url_article in urls_articles}
-                
-                # Traitement des résultats au fur et à mesure qu'ils sont terminés
-                for future in concurrent.futures.as_completed(futures):
-                    url_article = futures[future]
-                    try:
-                        result = future.result()
-                        if result:
-                            with self.results_lock:
-                                total_inseres += result['inserted']
-                                total_mis_a_jour += result['updated']
-                                logger.info(f"Article {'inséré' if result['inserted'] > 0 else 'mis à jour'}: {result['titre']} (Catégorie: {result['categorie']})")
-                    except Exception as e:
-                        logger.error(f"Exception lors du traitement de {url_article}: {str(e)}")
+            # Traitement en parallèle des articles, résultats consommés au fil de l'eau
+            for result in self.traiter_articles(urls_articles, categorie_forcee):
+                total_inseres += result['inserted']
+                total_mis_a_jour += result['updated']
+                logger.info(f"Article {'inséré' if result['inserted'] > 0 else 'mis à jour'}: {result['titre']} (Catégorie: {result['categorie']})")
+                if sur_resultat:
+                    sur_resultat(result)
             
             # self.pause_aleatoire(2.0, 4.0)
             
@@ -274,7 +348,8 @@ class ArticleScraper:
                 url_actuelle = None
 
         logger.info(f"Scraping terminé: {page_count} pages visitées, {total_articles} articles trouvés, {total_inseres} insérés, {total_mis_a_jour} mis à jour")
-        self.db_manager.close_connection()
+        if fermer_connexion:
+            self.close()
 
         return {
             "pages_visitees": page_count,
@@ -283,18 +358,58 @@ class ArticleScraper:
             "articles_mis_a_jour": total_mis_a_jour
         }
         
-    def traiter_article(self, url_article: str, categorie_forcee: str = None) -> Dict[str, Any]:
+    def traiter_article(self, url_article: str, categorie_forcee: str = None, forcer: bool = False) -> Dict[str, Any]:
         """
         Traite un article en l'extrayant et en le sauvegardant dans la base de données.
+        Si forcer est vrai, l'article est réextrait même s'il existe déjà (revisite).
         Retourne les résultats de l'opération.
         """
-        article_data = self.extraire_article(url_article, categorie_forcee)
+        article_data = self.extraire_article(url_article, categorie_forcee, forcer)
         if article_data:
             result = self.db_manager.save_article(article_data)
             return {
                 'inserted': result['inserted'],
                 'updated': result['updated'],
+                'url': article_data['url'],
                 'titre': article_data.get('titre', 'Sans titre'),
                 'categorie': article_data.get('categorie', 'Inconnue')
             }
         return None
+
+    def traiter_articles(self, urls_articles: Iterable[str], categorie_forcee: str = None,
+                         forcer: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Traite des articles en parallèle et renvoie leurs résultats dès qu'ils sont disponibles.
+        Au plus 2 * max_workers articles sont en cours à la fois, quel que soit le nombre d'URLs.
+        """
+        en_cours = {}
+        urls = iter(urls_articles)
+        limite = 2 * self.max_workers
+
+        while True:
+            for url_article in urls:
+                en_cours[self.executor.submit(self.traiter_article, url_article, categorie_forcee, forcer)] = url_article
+                if len(en_cours) >= limite:
+                    break
+            if not en_cours:
+                return
+
+            termines, _ = concurrent.futures.wait(en_cours, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in termines:
+                url_article = en_cours.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Exception lors du traitement de {url_article}: {str(e)}")
+                    continue
+                if result:
+                    yield result
+
+    def close(self) -> None:
+        """
+        Libère le pool de workers, l'étape images et la connexion MongoDB.
+        """
+        self.executor.shutdown(wait=True)
+        if self.pipeline_images:
+            self.pipeline_images.close()
+        self.db_manager.close_connection()
@@ -7,12 +7,14 @@ Module simplifié pour la gestion de la base de données MongoDB.
 
 import os
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import datetime
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from dotenv import load_dotenv
 
+from dedup import distance_hamming
+
 # Charger les variables d'environnement
 load_dotenv()
 
@@ -35,12 +37,15 @@ class DatabaseManager:
         self.mongo_uri = mongo_uri or os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
         self.db_name = db_name or os.getenv('DB_NAME', 'scraping_db')
         self.collection_name = collection_name or os.getenv('COLLECTION_NAME', 'articles')
+        self.scheduler_collection_name = os.getenv('SCHEDULER_COLLECTION', 'scheduler_state')
+        self.images_collection_name = os.getenv('IMAGES_COLLECTION', 'images')
         
         logger.info(f"Connexion à MongoDB: {self.mongo_uri}, DB: {self.db_name}, Collection: {self.collection_name}")
         
         self.client = None
         self.db = None
         self.collection = None
+        self.images = None
     
     def init_db(self) -> bool:
         """
@@ -57,9 +62,17 @@ class DatabaseManager:
             
             self.db = self.client[self.db_name]
             self.collection = self.db[self.collection_name]
+            self.images = self.db[self.images_collection_name]
             
             # Création d'index sur l'URL pour éviter les doublons
             self.collection.create_index([("url", 1)], unique=True, sparse=True)
+            # Index sur les URLs alternatives et les bandes SimHash pour la détection des doublons
+            self.collection.create_index([("doublons", 1)], sparse=True)
+            self.collection.create_index([("simhash_bands", 1)], sparse=True)
+            # Index sur la date de création pour l'amorçage des revisites du démon
+            self.collection.create_index([("created_at", 1)])
+            # Registre des images déjà traitées (une entrée par URL)
+            self.images.create_index([("url", 1)], unique=True)
             
             return True
         
@@ -76,6 +89,7 @@ class DatabaseManager:
             self.client = None
             self.db = None
             self.collection = None
+            self.images = None
             logger.info("Connexion à MongoDB fermée")
     
     def article_exists(self, url: str) -> bool:
@@ -83,7 +97,7 @@ class DatabaseManager:
         Vérifie si un article existe déjà dans la base de données.
         
         Args:
-            url: URL de l'article à vérifier
+            url: URL canonique de l'article à vérifier
             
         Returns:
             True si l'article existe déjà, False sinon
@@ -93,7 +107,8 @@ class DatabaseManager:
             self.init_db()
         
         try:
-            count = self.collection.count_documents({'url': url})
+            # L'URL peut être la clé principale ou une URL déjà liée comme doublon
+            count = self.collection.count_documents({'$or': [{'url': url}, {'doublons': url}]}, limit=1)
             return count > 0
         
         except Exception as e:
@@ -120,13 +135,20 @@ class DatabaseManager:
         
         try:
             # Ajout d'un horodatage
-            article_data['created_at'] = datetime.datetime.utcnow()
+            maintenant = datetime.datetime.utcnow()
+            article_data['updated_at'] = maintenant
             
             # Si l'article a une URL, on l'utilise comme clé unique
             if 'url' in article_data and article_data['url']:
+                # La date de création est conservée lors des mises à jour (revisites)
+                update = {'$set': article_data, '$setOnInsert': {'created_at': maintenant}}
+                # Les URLs alternatives sont ajoutées aux doublons existants au lieu de les remplacer
+                doublons = article_data.pop('doublons', None)
+                if doublons:
+                    update['$addToSet'] = {'doublons': {'$each': doublons}}
                 result = self.collection.update_one(
                     {'url': article_data['url']},
-                    {'$set': article_data},
+                    update,
                     upsert=True
                 )
                 
@@ -138,10 +160,148 @@ class DatabaseManager:
                     return {"inserted": 0, "updated": 1}
             else:
                 # Pas d'URL, on insère simplement
+                article_data['created_at'] = maintenant
                 self.collection.insert_one(article_data)
                 logger.info(f"Article inséré sans URL: {article_data.get('titre', 'Sans titre')}")
                 return {"inserted": 1, "updated": 0}
         
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde de l'article: {str(e)}")
-            return {"inserted": 0, "updated": 0} 
\ No newline at end of file
+            return {"inserted": 0, "updated": 0}
+
+    def articles_recents(self, depuis: datetime.datetime) -> List[Dict[str, Any]]:
+        """
+        Récupère les articles découverts depuis une date donnée.
+        
+        Args:
+            depuis: Date (UTC) à partir de laquelle les articles sont retournés
+            
+        Returns:
+            Liste de documents contenant l'URL, la catégorie et les dates de création et de dernière mise à jour
+        """
+        if self.collection is None:
+            logger.warning("La connexion à la base de données n'est pas initialisée")
+            self.init_db()
+        
+        try:
+            return list(self.collection.find(
+                {'created_at': {'$gte': depuis}},
+                {'_id': 0, 'url': 1, 'categorie': 1, 'created_at': 1, 'updated_at': 1}
+            ))
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des articles récents: {str(e)}")
+            return []
+    
+    def enregistrer_etat_planificateur(self, etat: Dict[str, Any]) -> None:
+        """
+        Publie l'état de la file du démon dans la collection SCHEDULER_COLLECTION pour l'API.
+        
+        Args:
+            etat: Instantané retourné par Planificateur.etat()
+        """
+        if self.collection is None:
+            logger.warning("La connexion à la base de données n'est pas initialisée")
+            self.init_db()
+        
+        try:
+            self.db[self.scheduler_collection_name].replace_one({'_id': 'daemon'}, etat, upsert=True)
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement de l'état du planificateur: {str(e)}")
+    
+    def get_image(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupère l'entrée du registre des images pour une URL déjà traitée.
+        
+        Args:
+            url: URL de l'image originale
+            
+        Returns:
+            Document de l'image (miniature, statut) ou None si l'image n'a pas été traitée
+        """
+        if self.images is None:
+            logger.warning("La connexion à la base de données n'est pas initialisée")
+            self.init_db()
+        
+        try:
+            return self.images.find_one({'url': url}, {'_id': 0})
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération de l'image {url}: {str(e)}")
+            return None
+    
+    def save_image(self, image_data: Dict[str, Any]) -> None:
+        """
+        Enregistre le résultat du traitement d'une image dans le registre des images.
+        
+        Args:
+            image_data: Dictionnaire contenant l'URL, la miniature et le statut de l'image
+        """
+        if self.images is None:
+            logger.warning("La connexion à la base de données n'est pas initialisée")
+            self.init_db()
+        
+        try:
+            self.images.update_one({'url': image_data['url']}, {'$set': image_data}, upsert=True)
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement de l'image {image_data.get('url')}: {str(e)}")
+    
+    def trouver_quasi_doublon(self, simhash: int, bands: List[str], distance_max: int) -> Optional[str]:
+        """
+        Cherche un article déjà stocké dont l'empreinte SimHash est proche.
+        Seuls les articles partageant au moins une bande sont comparés.
+        
+        Args:
+            simhash: Empreinte de l'article candidat
+            bands: Bandes de l'empreinte (voir dedup.bandes_simhash)
+            distance_max: Distance de Hamming maximale pour considérer un doublon
+            
+        Returns:
+            URL de l'article original si un quasi-doublon est trouvé, None sinon
+        """
+        if self.collection is None:
+            logger.warning("La connexion à la base de données n'est pas initialisée")
+            self.init_db()
+        
+        try:
+            candidats = self.collection.find(
+                {'simhash_bands': {'$in': bands}},
+                {'_id': 0, 'url': 1, 'simhash': 1}
+            )
+            for candidat in candidats:
+                if candidat.get('simhash') and distance_hamming(simhash, int(candidat['simhash'], 16)) <= distance_max:
+                    return candidat['url']
+            return None
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de la recherche de quasi-doublons: {str(e)}")
+            return None
+    
+    def lier_doublon(self, url_originale: str, url_doublon: str) -> bool:
+        """
+        Enregistre une URL comme doublon d'un article existant au lieu de la stocker à nouveau.
+        
+        Args:
+            url_originale: URL de l'article déjà stocké
+            url_doublon: URL de la republication détectée
+            
+        Returns:
+            True si le lien a été enregistré
+        """
+        if self.collection is None:
+            logger.warning("La connexion à la base de données n'est pas initialisée")
+            self.init_db()
+        
+        try:
+            result = self.collection.update_one(
+                {'url': url_originale},
+                {'$addToSet': {'doublons': url_doublon}}
+            )
+            logger.info(f"Doublon lié: {url_doublon} -> {url_originale}")
+            return result.matched_count > 0
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de la liaison du doublon {url_doublon}: {str(e)}")
+            return False
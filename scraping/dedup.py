@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module de déduplication des articles : canonicalisation des URLs et empreintes SimHash.
+"""
+
+import hashlib
+import re
+from typing import List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Paramètres de suivi supprimés lors de la canonicalisation
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+    "_ga", "_gl", "ref", "xtor", "amp"
+}
+TRACKING_PREFIXES = ("utm_",)
+
+SIMHASH_BITS = 64
+# 4 bandes de 16 bits : deux empreintes à distance <= 3 partagent forcément une bande
+SIMHASH_BANDS = 4
+SIMHASH_MAX_DISTANCE = 3
+# En dessous de ce nombre de mots, l'empreinte n'est pas assez discriminante
+SIMHASH_MIN_WORDS = 20
+
+
+def canonicaliser_url(url: str) -> str:
+    """
+    Normalise une URL d'article pour que ses différentes formes pointent vers la même clé.
+
+    Supprime les paramètres de suivi, le fragment, le port par défaut et les suffixes AMP,
+    et force le slash final utilisé par WordPress. Les chemins préfixés par une catégorie
+    ne sont pas réécrits ici : seule l'URL rel=canonical de la page permet de les rapprocher.
+
+    Args:
+        url: URL brute de l'article
+
+    Returns:
+        URL canonique
+    """
+    if not url:
+        return url
+
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+
+    segments = [s for s in parts.path.split("/") if s]
+    # Suppression des variantes AMP (/mon-article/amp/ ou /amp/mon-article/)
+    segments = [s for s in segments if s.lower() != "amp"]
+    path = "/" + "/".join(segments) + "/" if segments else "/"
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def _hash_token(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def calculer_simhash(texte: str, taille_shingle: int = 3) -> Optional[int]:
+    """
+    Calcule l'empreinte SimHash 64 bits d'un texte à partir de ses shingles de mots.
+
+    Args:
+        texte: Texte à empreinter (titre et corps de l'article)
+        taille_shingle: Nombre de mots par shingle
+
+    Returns:
+        Empreinte sous forme d'entier, ou None si le texte est trop court
+    """
+    mots = re.findall(r"\w+", (texte or "").lower())
+    if len(mots) < max(SIMHASH_MIN_WORDS, taille_shingle):
+        return None
+
+    shingles = [" ".join(mots[i:i + taille_shingle]) for i in range(len(mots) - taille_shingle + 1)]
+
+    poids = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        h = _hash_token(shingle)
+        for bit in range(SIMHASH_BITS):
+            poids[bit] += 1 if (h >> bit) & 1 else -1
+
+    empreinte = 0
+    for bit in range(SIMHASH_BITS):
+        if poids[bit] > 0:
+            empreinte |= 1 << bit
+    return empreinte
+
+
+def bandes_simhash(empreinte: int) -> List[str]:
+    """
+    Découpe une empreinte en bandes indexables ("<position>:<valeur hexa>").
+
+    Args:
+        empreinte: Empreinte SimHash
+
+    Returns:
+        Liste des clés de bandes
+    """
+    largeur = SIMHASH_BITS // SIMHASH_BANDS
+    masque = (1 << largeur) - 1
+    return [f"{i}:{(empreinte >> (i * largeur)) & masque:04x}" for i in range(SIMHASH_BANDS)]
+
+
+def distance_hamming(a: int, b: int) -> int:
+    """
+    Retourne le nombre de bits différents entre deux empreintes.
+    """
+    return bin(a ^ b).count("1")
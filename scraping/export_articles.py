@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Script d'export en masse des articles vers des fichiers colonnaires (Parquet ou Arrow).
+
+Les articles sont lus depuis un curseur MongoDB et écrits par lots, ce qui permet
+d'exporter toute la collection en une seule passe avec une mémoire constante.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterator, List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+
+from db_manager import DatabaseManager
+
+# Chargement des variables d'environnement depuis .env
+load_dotenv()
+
+logging.basicConfig(
+    level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO')),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+# Schéma fixe des colonnes exportées (les champs absents sont exportés à null)
+ARTICLE_SCHEMA = pa.schema([
+    ("titre", pa.string()),
+    ("url", pa.string()),
+    ("date_publication", pa.string()),
+    ("auteur", pa.string()),
+    ("resume", pa.string()),
+    ("image_principale", pa.string()),
+    ("categorie", pa.string()),
+    ("sous_categorie", pa.string()),
+    ("tags", pa.list_(pa.string())),
+    ("images", pa.list_(pa.struct([("url", pa.string()), ("alt", pa.string()), ("thumbnail", pa.string())]))),
+    ("image_principale_thumbnail", pa.string()),
+    ("extracted_at", pa.string()),
+    ("created_at", pa.timestamp("ms")),
+])
+
+FORMATS = ("parquet", "arrow")
+
+
+def iterer_lots(db_manager: DatabaseManager, query: Dict[str, Any], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Parcourt la collection avec un curseur côté serveur et renvoie les documents par lots.
+
+    Args:
+        db_manager: Gestionnaire de base de données initialisé
+        query: Filtre MongoDB à appliquer
+        batch_size: Nombre de documents par lot
+
+    Yields:
+        Listes d'au plus batch_size documents
+    """
+    projection = {name: 1 for name in ARTICLE_SCHEMA.names}
+    projection["_id"] = 0
+    cursor = db_manager.collection.find(query, projection, batch_size=batch_size, no_cursor_timeout=True)
+    try:
+        lot = []
+        for document in cursor:
+            lot.append(document)
+            if len(lot) >= batch_size:
+                yield lot
+                lot = []
+        if lot:
+            yield lot
+    finally:
+        cursor.close()
+
+
+def exporter(db_manager: DatabaseManager, chemin_sortie: str, format_sortie: str = "parquet",
+             query: Dict[str, Any] = None, batch_size: int = 5000) -> int:
+    """
+    Exporte les articles correspondant au filtre dans un fichier Parquet ou Arrow.
+
+    Args:
+        db_manager: Gestionnaire de base de données initialisé
+        chemin_sortie: Chemin du fichier à écrire
+        format_sortie: "parquet" ou "arrow" (format fichier IPC)
+        query: Filtre MongoDB à appliquer (toute la collection si None)
+        batch_size: Nombre de documents lus et écrits par lot
+
+    Returns:
+        Nombre d'articles exportés
+    """
+    if format_sortie not in FORMATS:
+        raise ValueError(f"Format inconnu: {format_sortie} (formats supportés: {', '.join(FORMATS)})")
+
+    if format_sortie == "parquet":
+        writer = pq.ParquetWriter(chemin_sortie, ARTICLE_SCHEMA, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(chemin_sortie, ARTICLE_SCHEMA)
+
+    total = 0
+    try:
+        for lot in iterer_lots(db_manager, query or {}, batch_size):
+            batch = pa.RecordBatch.from_pylist(lot, schema=ARTICLE_SCHEMA)
+            if format_sortie == "parquet":
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            total += len(lot)
+            logger.info(f"{total} articles exportés")
+    finally:
+        writer.close()
+
+    return total
+
+
+def main() -> int:
+    """
+    Point d'entrée du script d'export.
+
+    Returns:
+        Code de retour (0 en cas de succès, 1 en cas d'erreur)
+    """
+    parser = argparse.ArgumentParser(description="Export des articles vers Parquet ou Arrow")
+    parser.add_argument("sortie", help="Chemin du fichier de sortie")
+    parser.add_argument("--format", dest="format_sortie", choices=FORMATS, default="parquet",
+                        help="Format du fichier de sortie (défaut: parquet)")
+    parser.add_argument("--categorie", help="Exporter uniquement cette catégorie")
+    parser.add_argument("--sous-categorie", help="Exporter uniquement cette sous-catégorie")
+    parser.add_argument("--auteur", help="Filtrer par auteur (insensible à la casse)")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv('EXPORT_BATCH_SIZE', '5000')),
+                        help="Nombre d'articles par lot (défaut: 5000)")
+    args = parser.parse_args()
+
+    query = {}
+    if args.categorie:
+        query["categorie"] = args.categorie
+    if args.sous_categorie:
+        query["sous_categorie"] = args.sous_categorie
+    if args.auteur:
+        query["auteur"] = {"$regex": args.auteur, "$options": "i"}
+
+    db_manager = DatabaseManager()
+    try:
+        db_manager.init_db()
+        total = exporter(db_manager, args.sortie, args.format_sortie, query, args.batch_size)
+        logger.info(f"Export terminé: {total} articles écrits dans {args.sortie}")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Erreur lors de l'export des articles: {str(e)}")
+        return 1
+
+    finally:
+        db_manager.close_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module de traitement des images d'articles : résolution des sources lazy-load,
+déduplication des URLs et génération de miniatures dans un stockage adressé par contenu.
+"""
+
+import concurrent.futures
+import datetime
+import hashlib
+import io
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow est optionnel : sans lui l'étape images est désactivée
+    Image = None
+
+from db_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Attributs utilisés par les plugins de lazy-load WordPress, par ordre de priorité
+LAZY_ATTRIBUTES = ("data-src", "data-lazy-src", "data-original")
+LAZY_SRCSET_ATTRIBUTES = ("data-srcset", "data-lazy-srcset", "srcset")
+
+# Types d'images vectorielles que Pillow ne sait pas réduire en miniature
+NON_RASTER_TYPES = ("image/svg+xml",)
+
+
+def _meilleure_source_srcset(srcset: str) -> Optional[str]:
+    """
+    Retourne l'URL de plus grande largeur (ou densité) d'un attribut srcset.
+    """
+    meilleure, meilleure_taille = None, -1.0
+    for candidat in srcset.split(","):
+        morceaux = candidat.strip().split()
+        if not morceaux:
+            continue
+        taille = 0.0
+        if len(morceaux) > 1:
+            try:
+                taille = float(morceaux[1].rstrip("wx"))
+            except ValueError:
+                pass
+        if taille > meilleure_taille:
+            meilleure, meilleure_taille = morceaux[0], taille
+    return meilleure
+
+
+def resoudre_source_image(img: Any) -> Optional[str]:
+    """
+    Détermine l'URL réelle d'une balise <img>, en ignorant les placeholders lazy-load.
+
+    Args:
+        img: Balise BeautifulSoup <img>
+
+    Returns:
+        URL de l'image, ou None si seule une image inline (data:) est disponible
+    """
+    for attribut in LAZY_ATTRIBUTES:
+        src = img.get(attribut)
+        if src and not src.startswith("data:"):
+            return src
+    for attribut in LAZY_SRCSET_ATTRIBUTES:
+        srcset = img.get(attribut)
+        if srcset:
+            src = _meilleure_source_srcset(srcset)
+            if src and not src.startswith("data:"):
+                return src
+    src = img.get("src")
+    if src and not src.startswith("data:"):
+        return src
+    return None
+
+
+class ImagePipeline:
+    """
+    Télécharge chaque image unique une seule fois et en génère une miniature.
+
+    Les miniatures sont nommées d'après le SHA-256 du fichier original
+    (<2 premiers caractères>/<sha256>.webp) et la correspondance URL -> miniature
+    est enregistrée dans la collection MongoDB des images.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, session: requests.Session, dossier: str,
+                 max_workers: int = 4, taille_miniature: int = 400, taille_max: int = 10 * 1024 * 1024,
+                 timeout: int = 30):
+        """
+        Initialise l'étape de traitement des images.
+
+        Args:
+            db_manager: Gestionnaire de base de données initialisé
+            session: Session HTTP partagée avec le scraper
+            dossier: Dossier racine du stockage des miniatures
+            max_workers: Nombre maximal de téléchargements d'images simultanés
+            taille_miniature: Plus grand côté des miniatures, en pixels
+            taille_max: Taille maximale acceptée pour une image originale, en octets
+            timeout: Délai d'attente des requêtes HTTP, en secondes
+        """
+        if Image is None:
+            raise ImportError("Pillow est requis pour le traitement des images (pip install Pillow)")
+
+        self.db_manager = db_manager
+        self.session = session
+        self.dossier = dossier
+        self.taille_miniature = taille_miniature
+        self.taille_max = taille_max
+        self.timeout = timeout
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Lock()
+        self.en_cours: Dict[str, concurrent.futures.Future] = {}
+
+        os.makedirs(self.dossier, exist_ok=True)
+
+    def traiter_images(self, article_data: Dict[str, Any]) -> None:
+        """
+        Ajoute les miniatures aux images d'un article (clé "thumbnail" de chaque image
+        et champ "image_principale_thumbnail").
+
+        Args:
+            article_data: Dictionnaire de l'article, modifié sur place
+        """
+        urls = [image['url'] for image in article_data.get('images', [])]
+        if article_data.get('image_principale'):
+            urls.append(article_data['image_principale'])
+
+        futures = {url: self.miniature(url) for url in dict.fromkeys(urls)}
+        miniatures = {}
+        for url, future in futures.items():
+            try:
+                miniatures[url] = future.result()
+            except Exception as e:
+                logger.error(f"Erreur lors du traitement de l'image {url}: {str(e)}")
+                miniatures[url] = None
+
+        for image in article_data.get('images', []):
+            image['thumbnail'] = miniatures.get(image['url'])
+        if article_data.get('image_principale'):
+            article_data['image_principale_thumbnail'] = miniatures.get(article_data['image_principale'])
+
+    def miniature(self, url: str) -> concurrent.futures.Future:
+        """
+        Retourne un future donnant le chemin relatif de la miniature d'une URL.
+        Une URL déjà en cours de traitement n'est téléchargée qu'une fois.
+        """
+        with self.lock:
+            future = self.en_cours.get(url)
+            if future is not None:
+                return future
+            future = self.executor.submit(self._traiter_url, url)
+            self.en_cours[url] = future
+
+        # Enregistré hors du verrou : si le future est déjà terminé, le callback
+        # s'exécute immédiatement dans ce thread et reprend le verrou
+        future.add_done_callback(lambda _, url=url: self._terminer(url))
+        return future
+
+    def _terminer(self, url: str) -> None:
+        with self.lock:
+            self.en_cours.pop(url, None)
+
+    def _traiter_url(self, url: str) -> Optional[str]:
+        connue = self.db_manager.get_image(url)
+        if connue is not None:
+            return connue.get('thumbnail')
+
+        contenu = None
+        try:
+            # Sonde HEAD pour écarter les réponses qui ne sont pas des images matricielles ou trop lourdes
+            head = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            content_length = int(head.headers.get('Content-Length') or 0)
+            if head.ok and not self._est_image_matricielle(head.headers.get('Content-Type', '')):
+                statut = "ignoree"
+            elif content_length > self.taille_max:
+                statut = "trop_lourde"
+            else:
+                response = self.session.get(url, timeout=self.timeout)
+                response.raise_for_status()
+                if not self._est_image_matricielle(response.headers.get('Content-Type', '')):
+                    statut = "ignoree"
+                elif len(response.content) > self.taille_max:
+                    statut = "trop_lourde"
+                else:
+                    contenu = response.content
+
+        except (requests.exceptions.MissingSchema, requests.exceptions.InvalidSchema,
+                requests.exceptions.InvalidURL) as e:
+            # URL inexploitable : erreur définitive
+            logger.error(f"URL d'image invalide {url}: {str(e)}")
+            statut = "erreur"
+
+        except requests.HTTPError as e:
+            # Les réponses 4xx (404, 410...) sont définitives, les 5xx seront retentées
+            logger.error(f"Erreur HTTP lors du téléchargement de l'image {url}: {str(e)}")
+            if e.response is None or e.response.status_code >= 500:
+                return None
+            statut = "erreur"
+
+        except requests.RequestException as e:
+            # Les erreurs réseau (timeout, connexion) ne sont pas enregistrées pour que l'image soit retentée plus tard
+            logger.error(f"Erreur lors du téléchargement de l'image {url}: {str(e)}")
+            return None
+
+        miniature = None
+        if contenu is not None:
+            try:
+                miniature = self._enregistrer_miniature(contenu)
+                statut = "ok"
+            except Exception as e:
+                # Fichier corrompu ou format non pris en charge : inutile de le retélécharger
+                logger.error(f"Image invalide {url}: {str(e)}")
+                statut = "invalide"
+
+        self.db_manager.save_image({
+            'url': url,
+            'thumbnail': miniature,
+            'statut': statut,
+            'processed_at': datetime.datetime.utcnow()
+        })
+        return miniature
+
+    @staticmethod
+    def _est_image_matricielle(content_type: str) -> bool:
+        """
+        Indique si un Content-Type correspond à une image matricielle (les SVG sont exclus).
+        Un en-tête absent n'exclut pas l'image : le décodage tranchera.
+        """
+        content_type = content_type.split(';')[0].strip().lower()
+        if not content_type:
+            return True
+        return content_type.startswith('image/') and content_type not in NON_RASTER_TYPES
+
+    def _enregistrer_miniature(self, contenu: bytes) -> str:
+        """
+        Génère la miniature WebP d'une image si elle n'existe pas encore dans le stockage.
+
+        Returns:
+            Chemin de la miniature relatif au dossier de stockage
+        """
+        empreinte = hashlib.sha256(contenu).hexdigest()
+        relatif = f"{empreinte[:2]}/{empreinte}.webp"
+        chemin = os.path.join(self.dossier, relatif)
+        if os.path.exists(chemin):
+            return relatif
+
+        with Image.open(io.BytesIO(contenu)) as image:
+            image.thumbnail((self.taille_miniature, self.taille_miniature))
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+            # Écriture atomique pour ne jamais servir une miniature partielle
+            temporaire = f"{chemin}.{os.getpid()}.{threading.get_ident()}.tmp"
+            image.save(temporaire, "WEBP", quality=80)
+            os.replace(temporaire, chemin)
+
+        return relatif
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
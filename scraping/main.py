@@ -5,12 +5,14 @@
 Script principal pour le scraping des articles du Blog du Modérateur.
 """
 
+import argparse
 import logging
 import sys
 import os
 from dotenv import load_dotenv
 
 from article_scraper import ArticleScraper
+from scheduler import Planificateur
 
 # Chargement des variables d'environnement depuis .env
 load_dotenv()
@@ -33,25 +35,61 @@ logging.getLogger("chardet").setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
 # URLs des catégories à scraper
+# "intervalle" : délai en secondes entre deux rafraîchissements en mode démon
 CATEGORIES = [
    {
         "url": "https://www.blogdumoderateur.com/tech/",
-        "nom": "Tech"
+        "nom": "Tech",
+        "intervalle": 300
     },
     {
         "url": "https://www.blogdumoderateur.com/web/",
-        "nom": "Web"
+        "nom": "Web",
+        "intervalle": 600
     },
     {
         "url": "https://www.blogdumoderateur.com/social/",
-        "nom": "Social"
+        "nom": "Social",
+        "intervalle": 300
     },
      {
         "url": "https://www.blogdumoderateur.com/marketing/",
-        "nom": "Marketing"
+        "nom": "Marketing",
+        "intervalle": 900
     }
 ]
 
+def daemon() -> int:
+    """
+    Lance le scraper en mode démon : une seule session HTTP et une seule connexion
+    MongoDB, rafraîchissement périodique des catégories et revisite des articles récents.
+    
+    Returns:
+        Code de retour (0 en cas de succès, 1 en cas d'erreur)
+    """
+    try:
+        scraper = ArticleScraper(
+            collection_name=os.getenv('COLLECTION_NAME', 'articles'),
+            timeout=int(os.getenv('TIMEOUT', '30')),
+            max_workers=int(os.getenv('MAX_WORKERS', '5')),
+            traiter_images=os.getenv('PROCESS_IMAGES', 'false').lower() == 'true',
+            image_workers=int(os.getenv('IMAGE_WORKERS', '4'))
+        )
+        planificateur = Planificateur(
+            scraper,
+            CATEGORIES,
+            pages_rafraichies=int(os.getenv('DAEMON_REFRESH_PAGES', '2')),
+            revisite_base=int(os.getenv('DAEMON_REVISIT_BASE', '3600')),
+            revisite_facteur=int(os.getenv('DAEMON_REVISIT_FACTOR', '4')),
+            revisite_max=int(os.getenv('DAEMON_REVISIT_COUNT', '4'))
+        )
+        planificateur.executer()
+        return 0
+    
+    except Exception as e:
+        logger.error(f"Erreur lors de l'exécution du démon: {str(e)}")
+        return 1
+
 def main() -> int:
     """
     Point d'entrée principal du script.
@@ -59,6 +97,14 @@ def main() -> int:
     Returns:
         Code de retour (0 en cas de succès, 1 en cas d'erreur)
     """
+    parser = argparse.ArgumentParser(description="Scraping des articles du Blog du Modérateur")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Exécution continue avec rafraîchissement planifié des catégories")
+    args = parser.parse_args()
+    
+    if args.daemon:
+        return daemon()
+    
     # Paramètres pour le scraping
     max_pages = int(os.getenv('MAX_PAGES', '500'))  # Nombre de pages à scraper par catégorie
     
@@ -82,7 +128,9 @@ def main() -> int:
             scraper = ArticleScraper(
                 collection_name=collection_name,
                 timeout=int(os.getenv('TIMEOUT', '30')),
-                max_workers=int(os.getenv('MAX_WORKERS', '5'))
+                max_workers=int(os.getenv('MAX_WORKERS', '5')),
+                traiter_images=os.getenv('PROCESS_IMAGES', 'false').lower() == 'true',
+                image_workers=int(os.getenv('IMAGE_WORKERS', '4'))
             )
             
             # Exécution du scraping
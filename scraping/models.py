@@ -6,42 +6,55 @@ Module simplifié contenant le modèle d'article pour le blog du modérateur.
 """
 
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
 import datetime
 
-@dataclass
 class Article:
     """
     Représente un article du Blog du Modérateur avec ses informations essentielles.
+
+    La classe utilise __slots__ (pas de __dict__ par instance) pour limiter l'empreinte
+    mémoire des articles en cours de traitement ; to_dict() produit directement le
+    document stocké dans MongoDB.
     """
-    titre: str
-    url: str
-    date_publication: Optional[str] = None
-    auteur: Optional[str] = None
-    resume: Optional[str] = None
-    image_principale: Optional[str] = None
-    categorie: Optional[str] = None
-    sous_categorie: Optional[str] = None
-    tags: List[str] = field(default_factory=list)
-    images: List[Dict[str, str]] = field(default_factory=list)
+    __slots__ = (
+        "titre", "url", "date_publication", "auteur", "resume", "image_principale",
+        "categorie", "sous_categorie", "tags", "images", "simhash", "simhash_bands"
+    )
+
+    def __init__(self, titre: str, url: str, date_publication: Optional[str] = None, auteur: Optional[str] = None,
+                 resume: Optional[str] = None, image_principale: Optional[str] = None, categorie: Optional[str] = None,
+                 sous_categorie: Optional[str] = None, tags: Optional[List[str]] = None,
+                 images: Optional[List[Dict[str, str]]] = None, simhash: Optional[str] = None,
+                 simhash_bands: Optional[List[str]] = None):
+        self.titre = titre
+        self.url = url
+        self.date_publication = date_publication
+        self.auteur = auteur
+        self.resume = resume
+        self.image_principale = image_principale
+        self.categorie = categorie
+        self.sous_categorie = sous_categorie
+        self.tags = tags if tags is not None else []
+        self.images = images if images is not None else []
+        self.simhash = simhash
+        self.simhash_bands = simhash_bands if simhash_bands is not None else []
+
+    def __repr__(self) -> str:
+        return f"Article(titre={self.titre!r}, url={self.url!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Article):
+            return NotImplemented
+        return all(getattr(self, nom) == getattr(other, nom) for nom in self.__slots__)
 
     def to_dict(self) -> Dict[str, Any]:
         """
         Convertit l'objet Article en dictionnaire pour le stockage dans MongoDB.
+        Les listes sont transmises sans copie.
         
         Returns:
             Dictionnaire contenant les attributs de l'article
         """
-        return {
-            "titre": self.titre,
-            "url": self.url,
-            "date_publication": self.date_publication,
-            "auteur": self.auteur,
-            "resume": self.resume,
-            "image_principale": self.image_principale,
-            "categorie": self.categorie,
-            "sous_categorie": self.sous_categorie,
-            "tags": self.tags,
-            "images": self.images,
-            "extracted_at": datetime.datetime.utcnow().isoformat()
-        } 
\ No newline at end of file
+        document = {nom: getattr(self, nom) for nom in self.__slots__}
+        document["extracted_at"] = datetime.datetime.utcnow().isoformat()
+        return document
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module de planification pour le mode démon du scraper.
+
+Le démon garde une seule session HTTP et une seule connexion MongoDB ouvertes,
+rafraîchit les premières pages de chaque catégorie selon son propre intervalle
+et revisite les articles récents selon un calendrier décroissant pour récupérer
+leurs modifications.
+"""
+
+import datetime
+import heapq
+import itertools
+import logging
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from article_scraper import ArticleScraper
+
+logger = logging.getLogger(__name__)
+
+TACHE_CATEGORIE = "categorie"
+TACHE_REVISITE = "revisite"
+
+
+@dataclass(order=True)
+class Tache:
+    """
+    Tâche planifiée dans la file du démon, ordonnée par date d'échéance.
+    """
+    echeance: float
+    sequence: int
+    type: str = field(compare=False)
+    url: str = field(compare=False)
+    categorie: Optional[str] = field(default=None, compare=False)
+    revisite: int = field(default=0, compare=False)
+    decouvert_le: float = field(default=0.0, compare=False)
+
+
+class Planificateur:
+    """
+    Boucle de planification longue durée autour d'un ArticleScraper partagé.
+    """
+
+    def __init__(self, scraper: ArticleScraper, categories: List[Dict[str, Any]], pages_rafraichies: int = 2,
+                 intervalle_defaut: int = 900, revisite_base: int = 3600, revisite_facteur: int = 4,
+                 revisite_max: int = 4):
+        """
+        Initialise le planificateur.
+
+        Args:
+            scraper: Scraper dont la session HTTP et la connexion MongoDB restent ouvertes
+            categories: Catégories à rafraîchir ("url", "nom" et "intervalle" optionnel en secondes)
+            pages_rafraichies: Nombre de pages de listing relues à chaque rafraîchissement
+            intervalle_defaut: Intervalle de rafraîchissement des catégories sans "intervalle"
+            revisite_base: Délai avant la première revisite d'un article, en secondes
+            revisite_facteur: Facteur multiplicatif entre deux revisites successives
+            revisite_max: Nombre de revisites par article
+        """
+        self.scraper = scraper
+        self.categories = categories
+        self.intervalles = {c["url"]: c.get("intervalle", intervalle_defaut) for c in categories}
+        self.pages_rafraichies = pages_rafraichies
+        self.intervalle_defaut = intervalle_defaut
+        self.revisite_base = revisite_base
+        self.revisite_facteur = revisite_facteur
+        self.revisite_max = revisite_max
+
+        self.file: List[Tache] = []
+        self.sequence = itertools.count()
+        self.arret = threading.Event()
+        self.stats = {"rafraichissements": 0, "revisites": 0, "articles_inseres": 0, "articles_mis_a_jour": 0}
+
+    def delai_revisite(self, revisite: int) -> float:
+        """
+        Retourne le délai, depuis la découverte de l'article, de la revisite numéro `revisite`.
+        """
+        return self.revisite_base * (self.revisite_facteur ** revisite)
+
+    def planifier(self, echeance: float, type_tache: str, url: str, categorie: Optional[str] = None,
+                  revisite: int = 0, decouvert_le: float = 0.0) -> None:
+        heapq.heappush(self.file, Tache(echeance, next(self.sequence), type_tache, url, categorie, revisite, decouvert_le))
+
+    def planifier_revisite(self, url: str, categorie: Optional[str], decouvert_le: float,
+                           derniere_visite: float = 0.0, revisite: int = 0) -> None:
+        """
+        Planifie la prochaine revisite encore à venir d'un article.
+        Les revisites dont l'échéance précède la dernière visite (updated_at) sont déjà faites ;
+        les revisites manquées (démon arrêté) sont sautées, sauf la dernière.
+        """
+        maintenant = time.time()
+        while revisite < self.revisite_max and decouvert_le + self.delai_revisite(revisite) <= derniere_visite:
+            revisite += 1
+        while revisite < self.revisite_max - 1 and decouvert_le + self.delai_revisite(revisite + 1) <= maintenant:
+            revisite += 1
+        if revisite < self.revisite_max:
+            self.planifier(decouvert_le + self.delai_revisite(revisite), TACHE_REVISITE, url, categorie,
+                           revisite=revisite, decouvert_le=decouvert_le)
+
+    def amorcer(self) -> None:
+        """
+        Remplit la file : un rafraîchissement immédiat par catégorie et les revisites
+        des articles découverts pendant la fenêtre de revisite.
+        """
+        maintenant = time.time()
+        for categorie in self.categories:
+            self.planifier(maintenant, TACHE_CATEGORIE, categorie["url"], categorie["nom"])
+
+        fenetre = datetime.timedelta(seconds=self.delai_revisite(self.revisite_max - 1))
+        depuis = datetime.datetime.utcnow() - fenetre
+        for article in self.scraper.db_manager.articles_recents(depuis):
+            decouvert_le = article["created_at"].replace(tzinfo=datetime.timezone.utc).timestamp()
+            derniere_visite = decouvert_le
+            if article.get("updated_at"):
+                derniere_visite = article["updated_at"].replace(tzinfo=datetime.timezone.utc).timestamp()
+            self.planifier_revisite(article["url"], article.get("categorie"), decouvert_le, derniere_visite)
+
+        logger.info(f"File amorcée avec {len(self.file)} tâches")
+
+    def rafraichir_categorie(self, tache: Tache) -> None:
+        """
+        Relit les premières pages de listing d'une catégorie et traite les nouveaux articles.
+        """
+        def sur_resultat(result: Dict[str, Any]) -> None:
+            self.comptabiliser(result)
+            if result['inserted']:
+                maintenant = time.time()
+                self.planifier_revisite(result['url'], tache.categorie, maintenant, maintenant)
+
+        self.scraper.executer(tache.url, max_pages=self.pages_rafraichies, categorie_forcee=tache.categorie,
+                              fermer_connexion=False, sur_resultat=sur_resultat)
+
+        self.stats["rafraichissements"] += 1
+        intervalle = self.intervalles.get(tache.url, self.intervalle_defaut)
+        self.planifier(time.time() + intervalle, TACHE_CATEGORIE, tache.url, tache.categorie)
+
+    def revisiter_article(self, tache: Tache) -> None:
+        """
+        Réextrait un article existant pour enregistrer ses modifications, puis planifie la revisite suivante.
+        """
+        result = self.scraper.traiter_article(tache.url, tache.categorie, forcer=True)
+        if result:
+            self.comptabiliser(result)
+        self.stats["revisites"] += 1
+        if tache.revisite + 1 < self.revisite_max:
+            self.planifier(tache.decouvert_le + self.delai_revisite(tache.revisite + 1), TACHE_REVISITE, tache.url,
+                           tache.categorie, revisite=tache.revisite + 1, decouvert_le=tache.decouvert_le)
+
+    def comptabiliser(self, result: Dict[str, Any]) -> None:
+        self.stats["articles_inseres"] += result['inserted']
+        self.stats["articles_mis_a_jour"] += result['updated']
+
+    def etat(self) -> Dict[str, Any]:
+        """
+        Retourne un instantané de la file et des statistiques du démon.
+        """
+        prochaines = heapq.nsmallest(20, self.file)
+        return {
+            "mis_a_jour_le": datetime.datetime.utcnow(),
+            "taille_file": len(self.file),
+            "revisites_en_attente": sum(1 for t in self.file if t.type == TACHE_REVISITE),
+            "prochaines_taches": [
+                {
+                    "type": t.type,
+                    "url": t.url,
+                    "categorie": t.categorie,
+                    "revisite": t.revisite,
+                    "echeance": datetime.datetime.utcfromtimestamp(t.echeance)
+                }
+                for t in prochaines
+            ],
+            "statistiques": dict(self.stats)
+        }
+
+    def arreter(self, *_: Any) -> None:
+        logger.info("Arrêt du démon demandé")
+        self.arret.set()
+
+    def executer(self) -> None:
+        """
+        Boucle principale : exécute les tâches à échéance et publie l'état de la file
+        jusqu'à la réception de SIGINT ou SIGTERM.
+        """
+        signal.signal(signal.SIGINT, self.arreter)
+        signal.signal(signal.SIGTERM, self.arreter)
+
+        self.amorcer()
+        try:
+            while not self.arret.is_set():
+                self.scraper.db_manager.enregistrer_etat_planificateur(self.etat())
+
+                if not self.file:
+                    self.arret.wait(self.intervalle_defaut)
+                    continue
+
+                attente = self.file[0].echeance - time.time()
+                if attente > 0:
+                    self.arret.wait(attente)
+                    continue
+
+                tache = heapq.heappop(self.file)
+                try:
+                    if tache.type == TACHE_CATEGORIE:
+                        logger.info(f"Rafraîchissement de la catégorie {tache.categorie}")
+                        self.rafraichir_categorie(tache)
+                    else:
+                        logger.info(f"Revisite n°{tache.revisite + 1} de l'article {tache.url}")
+                        self.revisiter_article(tache)
+                except Exception as e:
+                    logger.error(f"Erreur lors de l'exécution de la tâche {tache.type} {tache.url}: {str(e)}")
+                    if tache.type == TACHE_CATEGORIE:
+                        self.planifier(time.time() + self.intervalle_defaut, TACHE_CATEGORIE, tache.url, tache.categorie)
+        finally:
+            self.scraper.close()
+            logger.info(f"Démon arrêté: {self.stats}")
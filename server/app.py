@@ -1,9 +1,9 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
 from pymongo import MongoClient
 from datetime import datetime
 import traceback
-from config import MONGO_URI, DB_NAME, COLLECTION_NAME
+from config import MONGO_URI, DB_NAME, COLLECTION_NAME, EXPORT_BATCH_SIZE, SCHEDULER_COLLECTION, THUMBNAILS_DIR
 
 app = Flask(__name__)
 CORS(app)  # Activation de CORS pour toutes les routes
@@ -20,21 +20,58 @@ except Exception as e:
     print(f"Erreur de connexion à MongoDB: {e}")
     traceback.print_exc()
 
+def build_articles_query(args):
+    """
+    Construit le filtre MongoDB à partir des paramètres de la requête.
+    Retourne un tuple (query, erreur) où erreur est un message si un paramètre est invalide.
+    """
+    query = {}
+
+    # Récupération des paramètres de filtrage
+    auteur = args.get("auteur")
+    categorie = args.get("categorie")
+    sous_categorie = args.get("sous_categorie")
+    titre = args.get("titre")
+    contenu = args.get("contenu")
+    start_date = args.get("start_date")
+    end_date = args.get("end_date")
+
+    # Construction de la requête
+    if auteur:
+        query["auteur"] = {"$regex": auteur, "$options": "i"}
+    if categorie:
+        # Correspondance exacte pour la catégorie (cas sensible)
+        query["categorie"] = categorie
+    if sous_categorie:
+        # Correspondance exacte pour la sous-catégorie (cas sensible)
+        query["sous_categorie"] = sous_categorie
+    if titre:
+        query["titre"] = {"$regex": titre, "$options": "i"}
+    if contenu:
+        query["contenu"] = {"$regex": contenu, "$options": "i"}
+
+    # Gestion des dates
+    if start_date or end_date:
+        query["date_publication"] = {}
+        if start_date:
+            try:
+                start_date_obj = datetime.strptime(start_date, "%Y-%m-%d")
+                query["date_publication"]["$gte"] = start_date_obj
+            except ValueError:
+                return None, "Format de date invalide pour start_date. Utilisez YYYY-MM-DD"
+        if end_date:
+            try:
+                end_date_obj = datetime.strptime(end_date, "%Y-%m-%d")
+                # Ajouter un jour pour inclure toute la journée
+                query["date_publication"]["$lte"] = end_date_obj
+            except ValueError:
+                return None, "Format de date invalide pour end_date. Utilisez YYYY-MM-DD"
+
+    return query, None
+
 @app.route("/articles", methods=["GET"])
 def get_articles():
     try:
-        # Paramètres de base pour filtrer les articles
-        query = {}
-
-        # Récupération des paramètres de filtrage
-        auteur = request.args.get("auteur")
-        categorie = request.args.get("categorie")
-        sous_categorie = request.args.get("sous_categorie")
-        titre = request.args.get("titre")
-        contenu = request.args.get("contenu")
-        start_date = request.args.get("start_date")
-        end_date = request.args.get("end_date")
-        
         # Paramètres de pagination
         page = int(request.args.get("page", 1))
         limit = int(request.args.get("limit", 10))
@@ -43,36 +80,9 @@ def get_articles():
         sort_by = request.args.get("sort_by", "date_publication")
         sort_order = -1 if request.args.get("sort_order", "desc").lower() == "desc" else 1
 
-        # Construction de la requête
-        if auteur:
-            query["auteur"] = {"$regex": auteur, "$options": "i"}
-        if categorie:
-            # Correspondance exacte pour la catégorie (cas sensible)
-            query["categorie"] = categorie
-        if sous_categorie:
-            # Correspondance exacte pour la sous-catégorie (cas sensible)
-            query["sous_categorie"] = sous_categorie
-        if titre:
-            query["titre"] = {"$regex": titre, "$options": "i"}
-        if contenu:
-            query["contenu"] = {"$regex": contenu, "$options": "i"}
-            
-        # Gestion des dates
-        if start_date or end_date:
-            query["date_publication"] = {}
-            if start_date:
-                try:
-                    start_date_obj = datetime.strptime(start_date, "%Y-%m-%d")
-                    query["date_publication"]["$gte"] = start_date_obj
-                except ValueError:
-                    return jsonify({"error": "Format de date invalide pour start_date. Utilisez YYYY-MM-DD"}), 400
-            if end_date:
-                try:
-                    end_date_obj = datetime.strptime(end_date, "%Y-%m-%d")
-                    # Ajouter un jour pour inclure toute la journée
-                    query["date_publication"]["$lte"] = end_date_obj
-                except ValueError:
-                    return jsonify({"error": "Format de date invalide pour end_date. Utilisez YYYY-MM-DD"}), 400
+        query, erreur = build_articles_query(request.args)
+        if erreur:
+            return jsonify({"error": erreur}), 400
 
         # Calcul du skip pour la pagination
         skip = (page - 1) * limit
@@ -100,6 +110,58 @@ def get_articles():
         traceback.print_exc()
         return jsonify({"error": "Une erreur est survenue lors de la récupération des articles"}), 500
 
+@app.route("/articles/export", methods=["GET"])
+def export_articles():
+    """
+    Exporte les articles filtrés au format NDJSON (un document JSON par ligne).
+    Les documents sont lus depuis un curseur côté serveur et envoyés au fil de l'eau,
+    sans construire la réponse complète en mémoire.
+    """
+    query, erreur = build_articles_query(request.args)
+    if erreur:
+        return jsonify({"error": erreur}), 400
+
+    try:
+        batch_size = int(request.args.get("batch_size", EXPORT_BATCH_SIZE))
+    except ValueError:
+        return jsonify({"error": "batch_size doit être un entier"}), 400
+    if batch_size <= 0:
+        return jsonify({"error": "batch_size doit être un entier strictement positif"}), 400
+
+    # Sans tri explicite, on parcourt la collection dans l'ordre naturel (une seule passe)
+    sort_by = request.args.get("sort_by")
+    sort_order = -1 if request.args.get("sort_order", "desc").lower() == "desc" else 1
+
+    def generate():
+        cursor = collection.find(query, {"_id": 0}, batch_size=batch_size, no_cursor_timeout=True)
+        if sort_by:
+            cursor = cursor.sort(sort_by, sort_order).allow_disk_use(True)
+        try:
+            for document in cursor:
+                yield app.json.dumps(document) + "\n"
+        except Exception as e:
+            # On relance l'exception pour interrompre la réponse chunked : le client
+            # ne doit pas confondre un export tronqué avec un export complet
+            print(f"Erreur lors de l'export des articles: {e}")
+            traceback.print_exc()
+            raise
+        finally:
+            cursor.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=articles.ndjson"}
+    )
+
+@app.route("/thumbnails/<path:nom>", methods=["GET"])
+def get_thumbnail(nom):
+    # Les miniatures sont adressées par le contenu : un nom donné ne change jamais
+    response = send_from_directory(THUMBNAILS_DIR, nom, max_age=31536000)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 @app.route("/health", methods=["GET"])
 def health():
     try:
@@ -109,6 +171,19 @@ def health():
     except Exception as e:
         return jsonify({"status": "error", "database": "disconnected", "error": str(e)}), 500
 
+@app.route("/scheduler", methods=["GET"])
+def get_scheduler_state():
+    try:
+        # État de la file publié par le démon de scraping (main.py --daemon)
+        etat = db[SCHEDULER_COLLECTION].find_one({"_id": "daemon"}, {"_id": 0})
+        if not etat:
+            return jsonify({"error": "Aucun démon de scraping actif"}), 404
+        return jsonify(etat), 200
+    except Exception as e:
+        print(f"Erreur lors de la récupération de l'état du démon: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/categories", methods=["GET"])
 def get_categories():
     try:
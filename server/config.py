@@ -1,3 +1,8 @@
+import os
+
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "scraping_db"
 COLLECTION_NAME = "articles"
+EXPORT_BATCH_SIZE = 1000
+SCHEDULER_COLLECTION = "scheduler_state"
+THUMBNAILS_DIR = os.getenv("THUMBNAILS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "thumbnails"))